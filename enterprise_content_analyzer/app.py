@@ -3,10 +3,12 @@ import pandas as pd
 from content_analyzer.analyzer import ContentAnalyser
 from content_analyzer.document_processor import DocumentProcessor
 from content_analyzer.cost_tracker import CostTracker
+from content_analyzer.results_store import ResultsStore
 import os
 import tempfile
 import json
 import plotly.express as px
+from datetime import date, datetime, timedelta
 
 st.set_page_config(layout="wide")
 
@@ -23,6 +25,20 @@ if 'batch_results_df' not in st.session_state:
 # Initialize CostTracker
 cost_tracker = CostTracker()
 
+# Initialize ResultsStore
+results_store = ResultsStore()
+
+# version changes on every append, so new results invalidate the cache;
+# max_entries evicts the entries left behind by older versions
+@st.cache_data(max_entries=16)
+def load_rollups(version, start_date, end_date, analysis_types):
+    return results_store.rollups(start_date, end_date, analysis_types)
+
+@st.cache_data(max_entries=2)
+def load_history(version, start_date, end_date, analysis_types):
+    results = results_store.load_results(start_date, end_date, analysis_types)
+    return results.drop(columns=["result_id", "document_id"]).sort_values("timestamp", ascending=False, ignore_index=True)
+
 # Display remaining budget in the sidebar
 st.sidebar.subheader("Budget Information")
 st.sidebar.write(f"Daily Remaining: **${cost_tracker.get_remaining_daily_budget():.2f}**")
@@ -31,6 +47,21 @@ st.sidebar.write(f"Monthly Remaining: **${cost_tracker.get_remaining_monthly_bud
 # Tabs for Single Analysis and Batch Processing
 tab1, tab2, tab3 = st.tabs(["Single Analysis", "Batch Processing", "Analytics"])
 
+def summarize_analysis(analysis):
+    sentiment_analysis = analysis.get("sentiment_analysis", {})
+    sentiment = sentiment_analysis.get("overall_sentiment", sentiment_analysis.get("sentiment", "N/A"))
+    confidence = sentiment_analysis.get("confidence_score", "N/A")
+    business_impact = analysis.get("business_impact", "N/A")
+    return sentiment, business_impact, confidence
+
+def save_history(records):
+    # Only successful analyses are recorded. A storage failure must not hide
+    # results the user has already paid for.
+    try:
+        results_store.append(records)
+    except Exception as e:
+        st.warning(f"Analysis results could not be saved to the analytics history: {e}")
+
 def display_analysis_results(analysis, analysis_type):
     st.markdown("### Analysis Report")
     for key, value in analysis.items():
@@ -120,6 +151,19 @@ with tab1:
                 display_analysis_results(analysis_result, single_analysis_type)
                 cost_tracker.record_usage(estimated_cost)
                 st.success(f"Analysis complete! Cost recorded: ${estimated_cost:.4f}")
+                sentiment, business_impact, confidence = summarize_analysis(analysis_result)
+                save_history([{
+                    "document_name": single_uploaded_file.name,
+                    "document_type": st.session_state.metadata['type'],
+                    "size": st.session_state.metadata['size'],
+                    "token_count": st.session_state.metadata['token_count'],
+                    "analysis_type": single_analysis_type,
+                    "timestamp": datetime.now().isoformat(),
+                    "sentiment": sentiment,
+                    "business_impact": business_impact,
+                    "confidence": confidence,
+                    "cost": estimated_cost
+                }])
         except ValueError as e:
             st.error(e)
         except Exception as e:
@@ -193,13 +237,16 @@ with tab2:
             my_bar.empty() # Clear the progress bar after completion
 
             results_data = []
+            history_records = []
             total_actual_cost = 0
             total_confidence = 0
             analyzed_docs_count = 0
+            docs_by_id = {doc['id']: doc for doc in st.session_state.processed_documents}
 
             for result in batch_results:
                 doc_id = result.get("id", "N/A")
-                doc_name = next((doc['name'] for doc in st.session_state.processed_documents if doc.get('id') == doc_id), f"Document {doc_id}")
+                original_doc = docs_by_id.get(doc_id)
+                doc_name = original_doc['name'] if original_doc else f"Document {doc_id}"
                 
                 if "error" in result:
                     st.error(f"Error analyzing {doc_name}: {result['error']}")
@@ -213,13 +260,9 @@ with tab2:
                     })
                 else:
                     analysis = result["analysis"]
-                    doc_type = next((doc['metadata']['type'] for doc in st.session_state.processed_documents if doc.get('id') == doc_id), "N/A")
-                    
-                    sentiment = analysis.get("sentiment_analysis", {}).get("overall_sentiment", analysis.get("sentiment_analysis", {}).get("sentiment", "N/A"))
-                    confidence = analysis.get("sentiment_analysis", {}).get("confidence_score", "N/A")
-                    business_impact = analysis.get("business_impact", "N/A")
+                    doc_type = original_doc['metadata']['type'] if original_doc else "N/A"
+                    sentiment, business_impact, confidence = summarize_analysis(analysis)
 
-                    original_doc = next((doc for doc in st.session_state.processed_documents if doc.get('id') == doc_id), None)
                     doc_cost = 0
                     if original_doc:
                         doc_cost = cost_tracker.calculate_cost(original_doc['metadata']['token_count'])
@@ -233,6 +276,18 @@ with tab2:
                         "Confidence": confidence,
                         "Cost": doc_cost
                     })
+                    history_records.append({
+                        "document_name": doc_name,
+                        "document_type": doc_type,
+                        "size": original_doc['metadata']['size'] if original_doc else 0,
+                        "token_count": original_doc['metadata']['token_count'] if original_doc else 0,
+                        "analysis_type": batch_analysis_type,
+                        "timestamp": result.get("timestamp", datetime.now().isoformat()),
+                        "sentiment": sentiment,
+                        "business_impact": business_impact,
+                        "confidence": confidence,
+                        "cost": doc_cost
+                    })
                     
                     if isinstance(confidence, (int, float)):
                         total_confidence += confidence
@@ -258,6 +313,7 @@ with tab2:
             
             cost_tracker.record_usage(total_actual_cost)
             st.success(f"Batch analysis complete! Total cost recorded: ${total_actual_cost:.4f}")
+            save_history(history_records)
         else:
             st.warning("No documents were successfully processed for batch analysis.")
     elif batch_analyze_button and not batch_uploaded_files:
@@ -265,44 +321,68 @@ with tab2:
 
 with tab3:
     st.subheader("Analysis Dashboard")
-    if not st.session_state.batch_results_df.empty:
-        df = st.session_state.batch_results_df.copy()
-        
+
+    col_filter1, col_filter2 = st.columns(2)
+    with col_filter1:
+        date_range = st.date_input(
+            "Date Range",
+            value=(date.today() - timedelta(days=90), date.today()),
+            key="analytics_date_range"
+        )
+    with col_filter2:
+        analytics_types = st.multiselect(
+            "Analysis Types",
+            ("General Business", "Competitive Intelligence", "Customer Feedback"),
+            default=("General Business", "Competitive Intelligence", "Customer Feedback"),
+            key="analytics_types"
+        )
+
+    # date_input returns a one-element tuple while the user is still picking the range end
+    start_date = date_range[0] if date_range else None
+    end_date = date_range[1] if len(date_range) > 1 else start_date
+    store_version = results_store.version()
+    rollups = load_rollups(store_version, start_date, end_date, tuple(analytics_types))
+
+    if not rollups["daily"].empty:
+        daily = rollups["daily"]
+
+        col_metrics1, col_metrics2 = st.columns(2)
+        with col_metrics1:
+            st.metric(label="Documents Analyzed", value=f"{daily['count'].sum():,}")
+        with col_metrics2:
+            st.metric(label="Total Cost", value=f"${daily['cost'].sum():.4f}")
+
         # Sentiment distribution pie chart
         st.markdown("#### Sentiment Distribution")
-        sentiment_counts = df['Sentiment'].value_counts().reset_index()
-        sentiment_counts.columns = ['Sentiment', 'Count']
-        fig_sentiment = px.pie(sentiment_counts, values='Count', names='Sentiment', title='Distribution of Sentiments')
+        fig_sentiment = px.pie(rollups["sentiment"], values='count', names='value', title='Distribution of Sentiments', labels={'value': 'Sentiment', 'count': 'Count'})
         st.plotly_chart(fig_sentiment, use_container_width=True)
 
         # Business impact Bar chart
         st.markdown("#### Business Impact Breakdown")
-        business_impact_counts = df['Business Impact'].value_counts().reset_index()
-        business_impact_counts.columns = ['Business Impact', 'Count']
-        fig_impact = px.bar(business_impact_counts, x='Business Impact', y='Count', title='Business Impact Breakdown')
+        fig_impact = px.bar(rollups["business_impact"], x='value', y='count', title='Business Impact Breakdown', labels={'value': 'Business Impact', 'count': 'Count'})
         st.plotly_chart(fig_impact, use_container_width=True)
 
-        # Confidence score histogram
+        # Confidence score histogram, pre-binned by the results store
         st.markdown("#### Confidence Score Distribution")
-        # Filter out non-numeric confidence scores
-        numeric_confidence = pd.to_numeric(df['Confidence'], errors='coerce').dropna()
-        if not numeric_confidence.empty:
-            fig_confidence = px.histogram(numeric_confidence, nbins=10, title='Distribution of Confidence Scores')
+        if not rollups["confidence"].empty:
+            fig_confidence = px.bar(rollups["confidence"], x='value', y='count', title='Distribution of Confidence Scores', labels={'value': 'Confidence', 'count': 'Count'})
             st.plotly_chart(fig_confidence, use_container_width=True)
         else:
             st.info("No numeric confidence scores available for histogram.")
 
-        # Cost per document analysis
-        st.markdown("#### Cost Per Document")
-        fig_cost = px.bar(df, x='Document', y='Cost', title='Cost Per Document Analysis')
+        # Cost over time
+        st.markdown("#### Cost Per Day")
+        fig_cost = px.bar(daily, x='date', y='cost', title='Analysis Cost Per Day', labels={'date': 'Date', 'cost': 'Cost'})
         st.plotly_chart(fig_cost, use_container_width=True)
 
         # Content type breakdown
         st.markdown("#### Content Type Breakdown")
-        content_type_counts = df['Type'].value_counts().reset_index()
-        content_type_counts.columns = ['Type', 'Count']
-        fig_type = px.pie(content_type_counts, values='Count', names='Type', title='Breakdown of Content Types')
+        fig_type = px.pie(rollups["type"], values='count', names='value', title='Breakdown of Content Types', labels={'value': 'Type', 'count': 'Count'})
         st.plotly_chart(fig_type, use_container_width=True)
 
+        # Full per-document history is only loaded on demand
+        if st.checkbox("Show analysis history", key="show_analysis_history"):
+            st.dataframe(load_history(store_version, start_date, end_date, tuple(analytics_types)))
+
     else:
-        st.info("Run a batch analysis to see analytics.")
+        st.info("Run an analysis to see analytics.")
@@ -0,0 +1,315 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+RESULTS_SCHEMA = pa.schema([
+    ("result_id", pa.string()),
+    ("document_id", pa.string()),
+    ("timestamp", pa.timestamp("us")),
+    ("sentiment", pa.string()),
+    ("business_impact", pa.string()),
+    ("confidence", pa.float64()),
+    ("cost", pa.float64()),
+    ("date", pa.string()),
+    ("analysis_type", pa.string()),
+])
+
+DOCUMENTS_SCHEMA = pa.schema([
+    ("document_id", pa.string()),
+    ("name", pa.string()),
+    ("type", pa.string()),
+    ("size", pa.int64()),
+    ("token_count", pa.int64()),
+    ("shard", pa.string()),
+])
+
+ROLLUPS_SCHEMA = pa.schema([
+    ("date", pa.string()),
+    ("analysis_type", pa.string()),
+    ("dimension", pa.string()),
+    ("value", pa.string()),
+    ("count", pa.int64()),
+    ("cost", pa.float64()),
+])
+
+RESULTS_PARTITIONING = ds.partitioning(
+    pa.schema([("date", pa.string()), ("analysis_type", pa.string())]), flavor="hive"
+)
+# Documents are sharded on the first hex digit of their id so an append only
+# rewrites the shards it adds to.
+DOCUMENTS_PARTITIONING = ds.partitioning(pa.schema([("shard", pa.string())]), flavor="hive")
+
+CONFIDENCE_BINS = np.linspace(0.0, 1.0, 11)
+CONFIDENCE_LABELS = [f"{lo:.1f}-{hi:.1f}" for lo, hi in zip(CONFIDENCE_BINS[:-1], CONFIDENCE_BINS[1:])]
+CONFIDENCE_OUT_OF_RANGE = "out of range"
+
+# Rollup dimension name -> column of the appended records it counts.
+ROLLUP_DIMENSIONS = {
+    "sentiment": "sentiment",
+    "business_impact": "business_impact",
+    "type": "document_type",
+    "confidence": "confidence_bin",
+}
+
+# Appends read, merge and replace whole files, so concurrent writers (one
+# thread per Streamlit session) must not interleave.
+_write_lock = threading.Lock()
+
+
+class ResultsStore:
+    """Persists every analysis result as Parquet for the Analytics tab.
+
+    Results are partitioned by date and analysis type, document metadata is
+    kept in its own table keyed by ``document_id``, and per-day rollups are
+    maintained alongside each append so dashboards only aggregate a few rows
+    per day instead of rescanning the full history. Every append compacts
+    what it touches: each results partition and documents shard it writes
+    to, and the rollups table, are rewritten as a single file.
+    """
+
+    def __init__(self, data_dir="analysis_results"):
+        self.data_dir = data_dir
+        self.results_dir = os.path.join(data_dir, "results")
+        self.documents_dir = os.path.join(data_dir, "documents")
+        self.rollups_file = os.path.join(data_dir, "rollups.parquet")
+        self.manifest_file = os.path.join(data_dir, "manifest.json")
+
+    def version(self):
+        """Returns a counter that changes on every append, for cache keys."""
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, "r") as f:
+                return json.load(f).get("version", 0)
+        return 0
+
+    def _bump_version(self):
+        manifest = {"version": self.version() + 1, "updated_at": datetime.now().isoformat()}
+        tmp_path = os.path.join(self.data_dir, f".manifest.json.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(tmp_path, self.manifest_file)
+
+    @staticmethod
+    def document_id(name, size, token_count):
+        """Returns a stable id for a document from its name, size and token count."""
+        key = f"{name}|{int(size)}|{int(token_count)}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    def append(self, records):
+        """Appends the records of successful analyses.
+
+        Each record is a dict with ``document_name``, ``document_type``,
+        ``size``, ``token_count``, ``analysis_type``, ``timestamp``,
+        ``sentiment``, ``business_impact``, ``confidence`` and ``cost``.
+        Timestamps are ISO 8601 strings or datetimes; naive ones are stored
+        as given and timezone-aware ones are converted to naive UTC.
+        Returns the number of records written.
+        """
+        if not records:
+            return 0
+
+        df = pd.DataFrame.from_records(records)
+        df["size"] = pd.to_numeric(df["size"], errors="coerce").fillna(0).astype("int64")
+        df["token_count"] = pd.to_numeric(df["token_count"], errors="coerce").fillna(0).astype("int64")
+        df["result_id"] = [uuid.uuid4().hex for _ in range(len(df))]
+        df["document_id"] = [
+            self.document_id(name, size, token_count)
+            for name, size, token_count in zip(df["document_name"], df["size"], df["token_count"])
+        ]
+        df["timestamp"] = (
+            pd.to_datetime(df["timestamp"], format="ISO8601", utc=True)
+            .dt.tz_convert(None)
+            .astype("datetime64[us]")
+        )
+        df["date"] = df["timestamp"].dt.strftime("%Y-%m-%d")
+        df["confidence"] = self._normalize_confidence(df["confidence"])
+        df["cost"] = pd.to_numeric(df["cost"], errors="coerce").fillna(0.0)
+        for column in ("sentiment", "business_impact", "document_type"):
+            df[column] = df[column].fillna("N/A").astype(str)
+
+        with _write_lock:
+            os.makedirs(self.data_dir, exist_ok=True)
+            self._append_documents(df)
+            self._append_results(df)
+            self._append_rollups(df)
+            self._bump_version()
+        return len(df)
+
+    def rebuild_rollups(self):
+        """Recomputes the rollups table from the stored results.
+
+        Repairs rollups left out of step with the results, e.g. by an append
+        that failed part way through.
+        """
+        with _write_lock:
+            os.makedirs(self.data_dir, exist_ok=True)
+            results = self.load_results().rename(columns={"type": "document_type"})
+            if results.empty:
+                if os.path.exists(self.rollups_file):
+                    os.remove(self.rollups_file)
+            else:
+                results["document_type"] = results["document_type"].fillna("N/A")
+                self._write_file(self._compute_rollups(results), ROLLUPS_SCHEMA, self.rollups_file)
+            self._bump_version()
+
+    @staticmethod
+    def _normalize_confidence(confidence):
+        # Scores are requested in [0, 1] but sometimes come back as percentages
+        confidence = pd.to_numeric(confidence, errors="coerce")
+        return confidence.where(~confidence.between(1, 100, inclusive="right"), confidence / 100)
+
+    def _write_file(self, df, schema, path):
+        table = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+        # Dot-prefixed so dataset readers skip it until it replaces the target
+        tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _read_file(self, path, schema, filter=None):
+        if not os.path.exists(path):
+            return schema.empty_table().to_pandas()
+        return pq.read_table(path, schema=schema, filters=filter, partitioning=None).to_pandas()
+
+    def _partition_file(self, base_dir, keys):
+        # Same hive layout and URI encoding that pyarrow's dataset reader expects
+        segments = [f"{name}={quote(str(value), safe='')}" for name, value in keys.items()]
+        return os.path.join(base_dir, *segments, "part-0.parquet")
+
+    def _update_partitions(self, df, schema, base_dir, partition_names, merge):
+        # Each touched partition is rewritten as a single file holding
+        # merge(existing rows, new rows); merge may return None to skip it.
+        file_schema = pa.schema([field for field in schema if field.name not in partition_names])
+        for values, new_rows in df.groupby(partition_names):
+            path = self._partition_file(base_dir, dict(zip(partition_names, values)))
+            merged = merge(self._read_file(path, file_schema), new_rows[file_schema.names])
+            if merged is None:
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._write_file(merged, file_schema, path)
+
+    def _append_documents(self, df):
+        documents = (
+            df.rename(columns={"document_name": "name", "document_type": "type"})
+            .drop_duplicates("document_id")
+        )
+        documents["shard"] = documents["document_id"].str[0]
+
+        def merge(existing, new_documents):
+            new_documents = new_documents[~new_documents["document_id"].isin(existing["document_id"])]
+            if new_documents.empty:
+                return None
+            return pd.concat([existing, new_documents], ignore_index=True)
+
+        self._update_partitions(documents, DOCUMENTS_SCHEMA, self.documents_dir, ["shard"], merge)
+
+    def _append_results(self, df):
+        self._update_partitions(
+            df,
+            RESULTS_SCHEMA,
+            self.results_dir,
+            ["date", "analysis_type"],
+            lambda existing, new_results: pd.concat([existing, new_results], ignore_index=True),
+        )
+
+    def _append_rollups(self, df):
+        rollups = pd.concat(
+            [self._read_file(self.rollups_file, ROLLUPS_SCHEMA), self._compute_rollups(df)],
+            ignore_index=True,
+        )
+        rollups = rollups.groupby(
+            ["date", "analysis_type", "dimension", "value"], as_index=False
+        )[["count", "cost"]].sum()
+        self._write_file(rollups, ROLLUPS_SCHEMA, self.rollups_file)
+
+    def _compute_rollups(self, df):
+        confidence_bin = pd.cut(
+            df["confidence"], bins=CONFIDENCE_BINS, labels=CONFIDENCE_LABELS, include_lowest=True
+        ).astype(object)
+        confidence_bin[confidence_bin.isna() & df["confidence"].notna()] = CONFIDENCE_OUT_OF_RANGE
+        df = df.assign(confidence_bin=confidence_bin, total="all")
+
+        frames = []
+        for dimension, column in {**ROLLUP_DIMENSIONS, "total": "total"}.items():
+            rollup = (
+                df.dropna(subset=[column])
+                .groupby(["date", "analysis_type", column])
+                .agg(count=("result_id", "size"), cost=("cost", "sum"))
+                .reset_index()
+                .rename(columns={column: "value"})
+            )
+            rollup["dimension"] = dimension
+            frames.append(rollup)
+        return pd.concat(frames, ignore_index=True)
+
+    def _filter(self, start_date=None, end_date=None, analysis_types=None):
+        expression = None
+        conditions = []
+        if start_date is not None:
+            conditions.append(ds.field("date") >= str(start_date))
+        if end_date is not None:
+            conditions.append(ds.field("date") <= str(end_date))
+        if analysis_types is not None:
+            # Typed value set so an empty selection matches nothing instead of failing
+            conditions.append(ds.field("analysis_type").isin(pa.array(list(analysis_types), pa.string())))
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def _read_dataset(self, base_dir, schema, partitioning, filter=None):
+        if not os.path.isdir(base_dir):
+            return schema.empty_table().to_pandas()
+        dataset = ds.dataset(base_dir, schema=schema, format="parquet", partitioning=partitioning)
+        return dataset.to_table(filter=filter).to_pandas()
+
+    def load_results(self, start_date=None, end_date=None, analysis_types=None):
+        """Returns results in the given range joined with their document metadata."""
+        results = self._read_dataset(
+            self.results_dir,
+            RESULTS_SCHEMA,
+            RESULTS_PARTITIONING,
+            self._filter(start_date, end_date, analysis_types),
+        )
+        documents = self._read_dataset(
+            self.documents_dir, DOCUMENTS_SCHEMA, DOCUMENTS_PARTITIONING
+        ).drop(columns="shard")
+        if results.empty:
+            return results.merge(documents, on="document_id", how="left")
+        return results.join(documents.set_index("document_id"), on="document_id")
+
+    def rollups(self, start_date=None, end_date=None, analysis_types=None):
+        """Aggregates the pre-computed daily rollups over the given range.
+
+        Returns a dict with one ``value``/``count``/``cost`` frame per rollup
+        dimension and a ``daily`` frame of per-day document counts and cost.
+        """
+        rollups = self._read_file(
+            self.rollups_file,
+            ROLLUPS_SCHEMA,
+            self._filter(start_date, end_date, analysis_types),
+        )
+        totals = rollups.groupby(["dimension", "value"], as_index=False)[["count", "cost"]].sum()
+
+        summary = {}
+        for dimension in ROLLUP_DIMENSIONS:
+            summary[dimension] = (
+                totals[totals["dimension"] == dimension]
+                .drop(columns="dimension")
+                .sort_values("count", ascending=False, ignore_index=True)
+            )
+        summary["confidence"] = summary["confidence"].sort_values("value", ignore_index=True)
+        summary["daily"] = (
+            rollups[rollups["dimension"] == "total"]
+            .groupby("date", as_index=False)[["count", "cost"]]
+            .sum()
+            .sort_values("date", ignore_index=True)
+        )
+        return summary
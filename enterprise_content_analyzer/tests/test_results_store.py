@@ -0,0 +1,147 @@
+import os
+import threading
+
+import pytest
+
+from content_analyzer.results_store import ResultsStore
+
+
+def make_record(**overrides):
+    record = {
+        "document_name": "report.txt",
+        "document_type": "txt",
+        "size": 2048,
+        "token_count": 500,
+        "analysis_type": "General Business",
+        "timestamp": "2026-10-01T09:30:00.123456",
+        "sentiment": "Positive",
+        "business_impact": "High",
+        "confidence": 0.85,
+        "cost": 0.005,
+    }
+    record.update(overrides)
+    return record
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(data_dir=str(tmp_path / "analysis_results"))
+
+
+def test_empty_store(store):
+    assert store.version() == 0
+    assert store.load_results().empty
+    rollups = store.rollups()
+    assert rollups["daily"].empty
+    assert rollups["sentiment"].empty
+
+
+def test_append_round_trip(store):
+    assert store.append([
+        make_record(),
+        make_record(document_name="feedback.pdf", document_type="pdf", sentiment="Negative", confidence="0.4"),
+    ]) == 2
+    assert store.version() == 1
+
+    results = store.load_results()
+    assert sorted(results["name"]) == ["feedback.pdf", "report.txt"]
+    assert sorted(results["type"]) == ["pdf", "txt"]
+    assert sorted(results["confidence"]) == [0.4, 0.85]
+
+    rollups = store.rollups()
+    assert dict(zip(rollups["sentiment"]["value"], rollups["sentiment"]["count"])) == {"Positive": 1, "Negative": 1}
+    assert dict(zip(rollups["type"]["value"], rollups["type"]["count"])) == {"txt": 1, "pdf": 1}
+    assert rollups["daily"]["date"].tolist() == ["2026-10-01"]
+    assert rollups["daily"]["cost"].sum() == pytest.approx(0.01)
+
+
+def test_appends_are_compacted(store, tmp_path):
+    for i in range(5):
+        store.append([make_record(document_name=f"doc_{i}.txt")])
+
+    partitions = [path.parent for path in (tmp_path / "analysis_results").rglob("*.parquet")]
+    assert len(partitions) == len(set(partitions))
+    assert len(store.load_results()) == 5
+    assert store.rollups()["daily"]["count"].tolist() == [5]
+
+
+def test_same_document_gets_one_id(store):
+    store.append([make_record()])
+    store.append([make_record(analysis_type="Customer Feedback")])
+
+    results = store.load_results()
+    assert results["document_id"].nunique() == 1
+    assert results["name"].tolist() == ["report.txt", "report.txt"]
+
+
+def test_filters(store):
+    store.append([
+        make_record(timestamp="2026-09-15T10:00:00"),
+        make_record(timestamp="2026-10-01T10:00:00", analysis_type="Customer Feedback"),
+        make_record(timestamp="2026-10-02T10:00:00"),
+    ])
+
+    assert store.rollups("2026-10-01", "2026-10-31")["daily"]["count"].sum() == 2
+    assert len(store.load_results(analysis_types=("Customer Feedback",))) == 1
+    assert store.rollups(analysis_types=())["daily"].empty
+    assert store.load_results(analysis_types=()).empty
+
+
+def test_mixed_timestamp_formats(store):
+    store.append([
+        make_record(timestamp="2026-10-01T10:00:00.123456"),
+        make_record(timestamp="2026-10-01T10:00:01"),
+    ])
+
+    assert len(store.load_results()) == 2
+
+
+def test_timezone_aware_timestamps_are_stored_as_utc(store):
+    store.append([
+        make_record(timestamp="2026-10-01T23:30:00-02:00"),
+        make_record(timestamp="2026-10-01T10:00:00+05:30"),
+    ])
+
+    results = store.load_results().sort_values("timestamp")
+    assert results["timestamp"].dt.strftime("%Y-%m-%d %H:%M").tolist() == ["2026-10-01 04:30", "2026-10-02 01:30"]
+    assert store.rollups()["daily"]["date"].tolist() == ["2026-10-01", "2026-10-02"]
+
+
+def test_concurrent_appends(store):
+    def append_records(thread):
+        for i in range(10):
+            store.append([make_record(document_name=f"doc_{thread}_{i}.txt")])
+
+    threads = [threading.Thread(target=append_records, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.load_results()) == 40
+    assert store.rollups()["daily"]["count"].sum() == 40
+    assert store.version() == 40
+
+
+def test_rebuild_rollups(store):
+    store.append([make_record(), make_record(document_name="feedback.pdf", document_type="pdf")])
+    expected = store.rollups()
+    os.remove(store.rollups_file)
+    assert store.rollups()["daily"].empty
+
+    store.rebuild_rollups()
+
+    rollups = store.rollups()
+    for name, frame in expected.items():
+        assert rollups[name].to_dict("list") == frame.to_dict("list")
+
+
+def test_confidence_out_of_range(store):
+    store.append([
+        make_record(confidence=85),
+        make_record(confidence=-1),
+        make_record(confidence="N/A"),
+    ])
+
+    confidence = store.rollups()["confidence"]
+    assert dict(zip(confidence["value"], confidence["count"])) == {"0.8-0.9": 1, "out of range": 1}